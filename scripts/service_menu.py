@@ -3,159 +3,743 @@
 
 This interactive menu provides shortcuts for common setup tasks such as
 TLS certificate generation and launching optional service containers.
-Each option invokes a placeholder shell command that can be replaced with
-project-specific logic in the future.
+Container entries talk to Docker directly; the remaining options are
+placeholders that can be replaced with project-specific logic in the
+future. Set ``SERVICE_MENU_DRY_RUN=1`` to show commands instead of
+running them.
 """
 
 from __future__ import annotations
 
-import curses
-import subprocess
-from typing import Callable, List, Tuple
+import argparse
+import asyncio
+import json
+import os
+import select
+import shlex
+import shutil
+import signal
+import sys
+import threading
+import time
+from asyncio.subprocess import DEVNULL, PIPE, STDOUT
+from concurrent.futures import ThreadPoolExecutor, wait
+from collections import deque
+from contextlib import suppress
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # annotations only; nothing here is imported at runtime
+    import curses
+    from concurrent.futures import Future
+    from typing import (
+        Awaitable,
+        Callable,
+        Collection,
+        Deque,
+        Dict,
+        List,
+        Mapping,
+        Optional,
+        Sequence,
+        Set,
+        Tuple,
+        Union,
+    )
 
-MenuItem = Tuple[str, Callable[[], None]]
+    # Exit code and output of a menu action, shown in the output window.
+    Result = Tuple[int, str]
+    Action = Callable[[], Awaitable[Result]]
+    # Menu entries carry either a coroutine action or, in ``--exec`` mode,
+    # the service names to exec Docker for (see ``_exec_start``), plus the Compose service name
+    # for container rows (None for rows that cannot be ticked).
+    MenuItem = Tuple[str, Union[Action, List[str]], Optional[str]]
+    Container = Tuple[str, str, str, Tuple[str, ...]]
+    # Called as ``runner(argv, env=..., cwd=..., capture=...)`` and returns
+    # the exit code with the combined stdout/stderr (empty unless captured).
+    Runner = Callable[..., Awaitable[Tuple[int, str]]]
+
+
+async def _default_runner(
+    command: List[str],
+    *,
+    env: Optional[Mapping[str, str]] = None,
+    cwd: Optional[str] = None,
+    capture: bool = True,
+) -> Tuple[int, str]:
+    """Run ``command`` and return its exit code and, if captured, output.
+
+    Output never reaches the terminal: it is either piped back to the
+    caller or sent to ``/dev/null``.
+    """
+    program = command[0]
+    # Resolve the way the child would: against its own PATH, and relative
+    # paths against its own working directory.
+    if cwd is not None and os.sep in program:
+        program = os.path.join(cwd, program)
+    search_path = (env if env is not None else os.environ).get("PATH", os.defpath)
+    executable = shutil.which(program, path=search_path)
+    if executable is None:
+        return 127, f"{command[0]}: command not found"
+    # An absolute executable with close_fds=False lets CPython start the
+    # child with posix_spawn instead of fork+exec whenever cwd is unset.
+    # Descriptors are non-inheritable by default, so none leak into it.
+    proc = await asyncio.create_subprocess_exec(
+        *command,
+        executable=executable,
+        stdout=PIPE if capture else DEVNULL,
+        stderr=STDOUT if capture else DEVNULL,
+        close_fds=False,
+        env=env,
+        cwd=cwd,
+    )
+    stdout, _ = await proc.communicate()
+    return proc.returncode, stdout.decode(errors="replace").strip() if capture else ""
 
 
-def run_command(command: List[str]) -> None:
-    """Execute a shell command and wait for it to complete."""
-    try:
-        subprocess.run(command, check=True)
-    except (
-        subprocess.CalledProcessError
-    ) as exc:  # pragma: no cover - informative output
-        print(f"Command failed: {exc}")
+async def _echo_runner(command: List[str], **_: object) -> Tuple[int, str]:
+    """Return ``command`` as text instead of running it; used for dry runs.
 
+    It never prints, even uncaptured: actions run on worker threads while
+    curses owns the terminal.
+    """
+    return 0, shlex.join(command)
 
-def generate_tls() -> None:
-    """Placeholder for TLS certificate generation."""
-    run_command(["echo", "Generating TLS certificates..."])
 
+# Set SERVICE_MENU_DRY_RUN to show the commands instead of executing them.
+# Every ``runner`` parameter defaults to this, so the switch applies to
+# direct calls as well as to the menu.
+_RUNNER: Runner = (
+    _echo_runner if os.environ.get("SERVICE_MENU_DRY_RUN") else _default_runner
+)
 
-def setup_supabase_extras() -> None:
-    """Placeholder for installing Supabase extras."""
-    run_command(["echo", "Setting up Supabase extras..."])
 
+def _failure_text(rc: int, command: List[str], output: str = "") -> str:
+    """Describe a failed command; failures are reported, never raised."""
+    return "\n".join(
+        filter(None, [f"Command failed (rc={rc}): {shlex.join(command)}", output])
+    )
 
-def start_langfuse() -> None:
-    """Start the Langfuse container."""
-    run_command(["echo", "docker run -d --name langfuse langfuse/langfuse:latest"])
 
+async def run_command(
+    command: List[str],
+    *,
+    runner: Runner = _RUNNER,
+    env: Optional[Mapping[str, str]] = None,
+    cwd: Optional[str] = None,
+    capture: bool = True,
+) -> Result:
+    """Execute a command through ``runner`` and return its exit code and output.
+
+    ``env`` replaces the child's environment and ``cwd`` sets its working
+    directory. With ``capture`` the combined stdout/stderr is returned
+    (prefixed with a failure line on a non-zero exit); otherwise it is
+    discarded.
+    """
+    rc, output = await runner(command, env=env, cwd=cwd, capture=capture)
+    if rc:
+        output = _failure_text(rc, command, output)
+    return rc, output
+
+
+async def generate_tls() -> Result:
+    """Placeholder for TLS certificate generation."""
+    return 0, "Generating TLS certificates..."
 
-def start_neo4j() -> None:
-    """Start the Neo4j container."""
-    run_command(["echo", "docker run -d --name neo4j neo4j:latest"])
 
+async def setup_supabase_extras() -> Result:
+    """Placeholder for installing Supabase extras."""
+    return 0, "Setting up Supabase extras..."
+
+
+# (menu label, service name, image, ``docker run`` style ``-e`` arguments)
+CONTAINERS: Tuple[Container, ...] = (
+    ("Langfuse", "langfuse", "langfuse/langfuse:latest", ()),
+    ("Neo4j", "neo4j", "neo4j:latest", ()),
+    ("Weaviate", "weaviate", "semitechnologies/weaviate:latest", ()),
+    ("Qdrant", "qdrant", "qdrant/qdrant:latest", ()),
+    ("PostgreSQL", "postgres", "postgres:latest", ("-e", "POSTGRES_PASSWORD=postgres")),
+    ("pgvector", "pgvector", "ankane/pgvector:latest", ()),
+    ("Sentry", "sentry", "getsentry/sentry:latest", ()),
+    ("OpenHands", "openhands", "openhands/openhands:latest", ()),
+    ("Archon", "archon", "archon/archon:latest", ()),
+    ("Agent-Zero", "agent_zero", "agentzero/agent-zero:latest", ()),
+)
+
+COMPOSE_FILE = Path(__file__).with_name("docker-compose.services.yml")
+
+
+def compose_yaml(containers: Sequence[Container] = CONTAINERS) -> str:
+    """Render the Compose file that creates every service container."""
+    lines = [
+        "# Generated by scripts/service_menu.py --write-compose; do not edit.",
+        "services:",
+    ]
+    for _, name, image, args in containers:
+        lines += [
+            f"  {name}:",
+            f"    image: {image}",
+            f"    container_name: {name}",
+            "    restart: unless-stopped",
+        ]
+        if len(args) % 2 or any(flag != "-e" for flag in args[::2]):
+            raise ValueError(f"unsupported docker run arguments for {name}: {args}")
+        if args:
+            lines.append("    environment:")
+            # JSON strings are valid YAML scalars, so ": ", " #" or a
+            # leading "*" in a value cannot change the document.
+            lines += [f"      - {json.dumps(value)}" for value in args[1::2]]
+    return "\n".join(lines) + "\n"
+
+
+def _compose_up_argv(names: Sequence[str]) -> List[str]:
+    return ["docker", "compose", "-f", str(COMPOSE_FILE), "up", "-d", *names]
+
+
+async def compose_up(names: Sequence[str], *, runner: Runner = _RUNNER) -> Result:
+    """Start several services with a single ``docker compose up`` call."""
+    return await run_command(_compose_up_argv(names), runner=runner)
+
+
+def _combine(results: Sequence[Union[Result, BaseException]]) -> Result:
+    """Merge several results: the first failure's rc and all output lines."""
+    rc, lines = 0, []
+    for result in results:
+        if isinstance(result, BaseException):
+            result = (1, repr(result))
+        rc = rc or result[0]
+        lines.append(result[1])
+    return rc, "\n".join(filter(None, lines))
+
+
+class ServiceRegistry:
+    """Start each service container once and reuse it afterwards.
+
+    Containers are only ever created through ``docker compose up`` (with
+    ``restart: unless-stopped``), so single and batch starts never clash
+    over a container name and later activations only need a cheap
+    ``docker inspect``. Docker itself is the source of truth, so no state is
+    cached here that could go stale.
+    """
+
+    async def states(
+        self, names: Sequence[str], *, runner: Runner = _RUNNER
+    ) -> List[Optional[bool]]:
+        """Return whether each container is running, None where it is missing."""
+        return await asyncio.gather(*(self._is_running(n, runner) for n in names))
+
+    async def _is_running(self, name: str, runner: Runner) -> Optional[bool]:
+        rc, state = await runner(
+            ["docker", "inspect", "-f", "{{.State.Running}}", name]
+        )
+        if rc == 0 and state in ("true", "false"):
+            return state == "true"
+        return None
+
+    async def ensure(self, name: str, *, runner: Runner = _RUNNER) -> Result:
+        """Make sure the ``name`` container is running, starting it if needed."""
+        return await self.ensure_many([name], runner=runner)
+
+    async def ensure_many(
+        self, names: Sequence[str], *, runner: Runner = _RUNNER
+    ) -> Result:
+        """Make sure every container in ``names`` is running.
+
+        Running containers are left alone and stopped ones are restarted with
+        ``docker start``; only missing ones go to a single ``docker compose
+        up``, so containers created earlier are never recreated.
+        """
+        states = await self.states(names, runner=runner)
+        stopped = [name for name, state in zip(names, states) if state is False]
+        missing = [name for name, state in zip(names, states) if state is None]
+        starts = []
+        if stopped:
+            starts.append(run_command(["docker", "start", *stopped], runner=runner))
+        if missing:
+            starts.append(compose_up(missing, runner=runner))
+        return _combine(
+            [(0, f"{name} is already running") for name, s in zip(names, states) if s]
+            + await asyncio.gather(*starts)
+        )
+
+
+registry = ServiceRegistry()
+
+
+def _starter(
+    name: str, runner: Runner = _RUNNER, exec_mode: bool = False
+) -> Union[Action, List[str]]:
+    """Return an action that ensures the ``name`` container is running.
+
+    In ``exec_mode`` the service name is returned instead so the menu can
+    replace itself with Docker via ``_exec_start``.
+    """
+    if exec_mode:
+        return [name]
+    return lambda: registry.ensure(name, runner=runner)
+
+
+def _container_starters(
+    runner: Runner = _RUNNER, exec_mode: bool = False
+) -> Tuple[Union[Action, List[str]], ...]:
+    return tuple(_starter(name, runner, exec_mode) for _, name, _, _ in CONTAINERS)
+
+
+CONTAINER_STARTERS: Tuple[Action, ...] = _container_starters()
+
+
+async def start_all(selected: Sequence[Action] = CONTAINER_STARTERS) -> Result:
+    """Run the given start actions concurrently rather than one after another.
 
-def start_weaviate() -> None:
-    """Start the Weaviate container."""
-    run_command(
-        ["echo", "docker run -d --name weaviate semitechnologies/weaviate:latest"]
+    The menu's "Start all" row does not use this: each action is its own
+    ``docker compose up``, whereas ``ServiceRegistry.ensure_many`` batches.
+    """
+    return _combine(
+        await asyncio.gather(*(fn() for fn in selected), return_exceptions=True)
     )
 
 
-def start_qdrant() -> None:
-    """Start the Qdrant container."""
-    run_command(["echo", "docker run -d --name qdrant qdrant/qdrant:latest"])
+async def _noop() -> Result:
+    return 0, ""
 
 
-def start_postgres() -> None:
-    """Start the PostgreSQL container."""
-    run_command(
-        [
-            "echo",
-            "docker run -d --name postgres -e POSTGRES_PASSWORD=postgres postgres:latest",
-        ]
+def _build_menu(runner: Runner = _RUNNER, exec_mode: bool = False) -> List[MenuItem]:
+    names = [name for _, name, *_ in CONTAINERS]
+    # Like a batch of ticked rows, "Start all" is one registry call and so
+    # at most one ``docker compose up`` for the whole project.
+    start_all_entry: Union[Action, List[str]] = (
+        names if exec_mode else partial(registry.ensure_many, names, runner=runner)
     )
+    return [
+        ("Generate TLS certificates", generate_tls, None),
+        ("Install Supabase extras", setup_supabase_extras, None),
+        *(
+            (f"Start {label} container", entry, name)
+            for (label, name, *_), entry in zip(
+                CONTAINERS, _container_starters(runner, exec_mode)
+            )
+        ),
+        ("Start all containers", start_all_entry, None),
+        ("Exit", _noop, None),
+    ]
 
 
-def start_pgvector() -> None:
-    """Start a PostgreSQL container with the pgvector extension."""
-    run_command(["echo", "docker run -d --name pgvector ankane/pgvector:latest"])
+# Minimum spacing between full repaints (60 Hz).
+_FRAME_INTERVAL = 1 / 60
 
+_MENU: Tuple[MenuItem, ...] = tuple(_build_menu())
+# Compose service name for each menu row, or None when the row is not a
+# container and so cannot be ticked for a batch start.
+SERVICE_NAMES: Tuple[Optional[str], ...] = tuple(name for _, _, name in _MENU)
 
-def start_sentry() -> None:
-    """Start the Sentry container."""
-    run_command(["echo", "docker run -d --name sentry getsentry/sentry:latest"])
 
+def _row_text(idx: int, label: str, selected: Collection[int] = ()) -> str:
+    if SERVICE_NAMES[idx] is None:
+        return label
+    return f"[{'x' if idx in selected else ' '}] {label}"
 
-def start_openhands() -> None:
-    """Start the OpenHands container."""
-    run_command(["echo", "docker run -d --name openhands openhands/openhands:latest"])
 
+_LABEL_LENS: Tuple[int, ...] = tuple(
+    len(_row_text(idx, label)) for idx, (label, *_) in enumerate(_MENU)
+)
+# Each row pre-encoded as (unticked, ticked) so drawing never encodes text;
+# index with ``idx in selected``.
+_ROW_BYTES: Tuple[Tuple[bytes, bytes], ...] = tuple(
+    (_row_text(idx, label).encode(), _row_text(idx, label, {idx}).encode())
+    for idx, (label, *_) in enumerate(_MENU)
+)
 
-def start_archon() -> None:
-    """Start the Archon container."""
-    run_command(["echo", "docker run -d --name archon archon/archon:latest"])
+# Height of the bordered output window at the bottom of the screen.
+_OUTPUT_HEIGHT = 4
 
 
-def start_agent_zero() -> None:
-    """Start the Agent-Zero container."""
-    run_command(["echo", "docker run -d --name agent_zero agentzero/agent-zero:latest"])
+def _menu_height(h: int) -> int:
+    """Screen rows available to the menu above the output window."""
+    return max(h - _OUTPUT_HEIGHT, 0)
 
 
-def _build_menu() -> List[MenuItem]:
-    return [
-        ("Generate TLS certificates", generate_tls),
-        ("Install Supabase extras", setup_supabase_extras),
-        ("Start Langfuse container", start_langfuse),
-        ("Start Neo4j container", start_neo4j),
-        ("Start Weaviate container", start_weaviate),
-        ("Start Qdrant container", start_qdrant),
-        ("Start PostgreSQL container", start_postgres),
-        ("Start pgvector container", start_pgvector),
-        ("Start Sentry container", start_sentry),
-        ("Start OpenHands container", start_openhands),
-        ("Start Archon container", start_archon),
-        ("Start Agent-Zero container", start_agent_zero),
-        ("Exit", lambda: None),
-    ]
+# Attribute for the highlighted row; cached once the colour pair exists.
+_HL_ATTR = 0
+
+
+# Only the current size is cached: centring is recomputed when the window
+# is resized, and sizes passed while dragging are not kept around.
+@lru_cache(maxsize=1)
+def _layout(h: int, w: int, label_lens: Tuple[int, ...]) -> Tuple[List[int], List[int]]:
+    """Row coordinates that centre rows of ``label_lens`` on an h x w screen.
+
+    Rows are centred above the output window, whose rows are kept free.
+    """
+    n = len(label_lens)
+    xs = [w // 2 - length // 2 for length in label_lens]
+    ys = [_menu_height(h) // 2 - n // 2 + i for i in range(n)]
+    return xs, ys
 
 
 def draw_menu(
-    stdscr: curses.window, selected_row_idx: int, menu: List[MenuItem]
+    stdscr: curses.window,
+    selected_row_idx: int,
+    rows: Sequence[Tuple[bytes, bytes]],
+    label_lens: Tuple[int, ...],
+    selected: Collection[int] = (),
+    pending: Optional[Mapping[int, Future]] = None,
+    output: str = "",
 ) -> None:
-    stdscr.clear()
+    """Repaint the whole menu; used on first entry and after a resize."""
+    import curses
+
+    pending = pending or {}
+    stdscr.erase()
+    xs, ys = _layout(*stdscr.getmaxyx(), label_lens)
+    for idx, variants in enumerate(rows):
+        label = variants[idx in selected]
+        status = _status(pending.get(idx))
+        redraw_row(stdscr, label, xs[idx], ys[idx], idx == selected_row_idx, status)
+    _draw_output(stdscr, output)
+    curses.doupdate()
+
+
+def _draw_output(stdscr: curses.window, text: str) -> None:
+    """Show the tail of the last finished job's output in a bordered window.
+
+    Empty ``text`` clears the window. Like ``redraw_row`` this only stages
+    the window for ``curses.doupdate``.
+    """
     h, w = stdscr.getmaxyx()
-    for idx, item in enumerate(menu):
-        x = w // 2 - len(item[0]) // 2
-        y = h // 2 - len(menu) // 2 + idx
-        if idx == selected_row_idx:
-            stdscr.attron(curses.color_pair(1))
-            stdscr.addstr(y, x, item[0])
-            stdscr.attroff(curses.color_pair(1))
-        else:
-            stdscr.addstr(y, x, item[0])
-    stdscr.refresh()
+    if h < _OUTPUT_HEIGHT or w < 3:
+        return
+    win = _output_window(h, w)
+    win.erase()
+    if text:
+        win.box()
+        for i, line in enumerate(text.splitlines()[2 - _OUTPUT_HEIGHT :]):
+            win.addnstr(1 + i, 1, line, w - 2)
+    win.noutrefresh()
+
+
+@lru_cache(maxsize=1)
+def _output_window(h: int, w: int) -> curses.window:
+    """The output window for an h x w screen, created once per size."""
+    import curses
+
+    return curses.newwin(_OUTPUT_HEIGHT, w, h - _OUTPUT_HEIGHT, 0)
+
+
+def redraw_row(
+    stdscr: curses.window,
+    label: bytes,
+    x: int,
+    y: int,
+    highlighted: bool,
+    status: bytes = b"",
+) -> None:
+    """Rewrite a single row and its job marker.
 
+    Whatever falls outside a shrunken terminal is clipped rather than
+    drawn. The caller flushes with ``curses.doupdate``.
+    """
+    import curses
 
-def run_menu(stdscr: curses.window) -> None:
+    h, w = stdscr.getmaxyx()
+    # Rows that do not fit above the output window are not drawn over it.
+    if not 0 <= y < _menu_height(h):
+        return
+    status_x = x + len(label) + 1
+    if x < 0:
+        label, x = label[-x:], 0
+    # curses reports ERR after writing the bottom-right cell even though
+    # the text was drawn.
+    with suppress(curses.error):
+        stdscr.addnstr(y, x, label, w - x, _HL_ATTR if highlighted else 0)
+        # The marker is multi-byte; draw it whole or not at all.
+        if status and 0 <= status_x and status_x + 2 <= w:
+            stdscr.addstr(y, status_x, status)
+    stdscr.noutrefresh()
+
+
+_STATUS_RUNNING, _STATUS_OK, _STATUS_FAILED = "⏳".encode(), "✓ ".encode(), "✗ ".encode()
+
+
+def _status(fut: Optional[Future]) -> bytes:
+    """Two-cell job marker shown to the right of a row; empty without a job."""
+    if fut is None:
+        return b""
+    if not fut.done():
+        return _STATUS_RUNNING
+    return _STATUS_FAILED if fut.exception() or fut.result()[0] else _STATUS_OK
+
+
+def _output(fut: Future) -> str:
+    exc = fut.exception()
+    return repr(exc) if exc else fut.result()[1]
+
+
+class _WakePipe:
+    """Self-pipe that wakes the menu loop from signal handlers and workers.
+
+    Jobs may still finish after the menu has quit, so waking a closed pipe
+    is a no-op rather than a write to a stale (or reused) descriptor.
+    """
+
+    def __init__(self) -> None:
+        self.r, self.w = os.pipe()
+        os.set_blocking(self.w, False)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def wake(self, reason: bytes) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            # A full pipe already guarantees a pending wake-up.
+            with suppress(BlockingIOError):
+                os.write(self.w, reason)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            os.close(self.r)
+            os.close(self.w)
+
+
+def _submit(
+    action: Action,
+    pool: ThreadPoolExecutor,
+    waker: _WakePipe,
+    finished: Deque[Future],
+) -> Future:
+    """Run ``action`` on ``pool`` and wake the menu loop when it finishes.
+
+    Completed futures are queued on ``finished`` for the loop to collect.
+    """
+
+    def _done(fut: Future) -> None:
+        finished.append(fut)
+        waker.wake(b"C")
+
+    fut = pool.submit(lambda: asyncio.run(action()))
+    fut.add_done_callback(_done)
+    return fut
+
+
+def _resize(stdscr: curses.window) -> None:
+    """Tell curses about the new terminal size after a SIGWINCH."""
+    import curses
+
+    cols, lines = os.get_terminal_size(sys.__stdout__.fileno())
+    curses.resizeterm(lines, cols)
+
+
+def _exec(argv: List[str]) -> None:
+    """Replace this process with ``argv`` after restoring the terminal.
+
+    If ``argv`` cannot be executed (e.g. Docker is not installed) a failure
+    line is printed and the menu exits with status 127 like a shell would.
+    """
+    import curses
+
+    curses.endwin()
+    if _RUNNER is _echo_runner:
+        argv = ["echo", *argv]
+    try:
+        os.execvp(argv[0], argv)
+    except OSError as exc:
+        print(_failure_text(127, argv, f"{argv[0]}: {exc.strerror}"), file=sys.stderr)
+        sys.exit(127)
+
+
+def _exec_start(names: Sequence[str], runner: Runner = _RUNNER) -> None:
+    """Replace this process with Docker starting the ``names`` containers.
+
+    As in ``ServiceRegistry.ensure_many``, containers that already exist
+    (including ones Compose did not create) get ``docker start`` and only
+    missing ones go to ``docker compose up``; with both kinds, a shell runs
+    the ``docker start`` and then execs Compose.
+    """
+    states = asyncio.run(registry.states(names, runner=runner))
+    existing = [name for name, state in zip(names, states) if state is not None]
+    missing = [name for name, state in zip(names, states) if state is None]
+    start, up = ["docker", "start", *existing], _compose_up_argv(missing)
+    if not missing:
+        _exec(start)
+    elif not existing:
+        _exec(up)
+    else:
+        _exec(["sh", "-c", f"{shlex.join(start)} && exec {shlex.join(up)}"])
+
+
+def run_menu(stdscr: curses.window, exec_mode: bool = False) -> List[Future]:
+    """Show the menu until the user quits; return the jobs still running."""
+    # SIGWINCH and finished jobs are delivered through a self-pipe so the
+    # loop can sleep in select() and wake only when there is work to do.
+    waker = _WakePipe()
+    # Actions run here so the menu keeps responding while they wait. Each
+    # run gets its own pool, so the menu can be shown more than once.
+    pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 4)
+    previous = signal.signal(signal.SIGWINCH, lambda *_: waker.wake(b"R"))
+    running: List[Future] = []
+    try:
+        running = _menu_loop(stdscr, waker, pool, exec_mode)
+    finally:
+        signal.signal(signal.SIGWINCH, previous)
+        # Close the pipe first so callbacks of jobs finishing from here on,
+        # including the ones cancelled below, no longer touch it.
+        waker.close()
+        pool.shutdown(wait=False, cancel_futures=True)
+    return [fut for fut in running if not fut.done()]
+
+
+def _menu_loop(
+    stdscr: curses.window,
+    waker: _WakePipe,
+    pool: ThreadPoolExecutor,
+    exec_mode: bool,
+) -> List[Future]:
+    import curses
+
+    enter_keys = frozenset({curses.KEY_ENTER, ord("\n"), ord("\r")})
     curses.curs_set(0)
     curses.init_pair(1, curses.COLOR_BLACK, curses.COLOR_WHITE)
-    menu = _build_menu()
+    global _HL_ATTR
+    _HL_ATTR = curses.color_pair(1)
+    stdscr.nodelay(False)
+    menu = tuple(_build_menu(exec_mode=True)) if exec_mode else _MENU
+    exit_idx = len(menu) - 1
     current_row = 0
+    selected: Set[int] = set()
+    pending: Dict[int, Future] = {}
+    finished: Deque[Future] = deque()
+    output = ""
+
+    def busy(row: int) -> bool:
+        return row in pending and not pending[row].done()
+
+    # State changes only mark what is stale; the bottom of the loop paints
+    # at most once per _FRAME_INTERVAL. ``dirty`` asks for a full repaint
+    # (first entry and resizes), ``dirty_rows`` for single rows and
+    # ``output_dirty`` for the output window; ``drawn_row`` is the row that
+    # is highlighted on screen.
+    dirty, output_dirty, drawn_row = True, False, current_row
+    dirty_rows: Set[int] = set()
+    resize_pending = False
+    last_draw = float("-inf")
     while True:
-        draw_menu(stdscr, current_row, menu)
-        key = stdscr.getch()
-        if key == curses.KEY_UP and current_row > 0:
-            current_row -= 1
-        elif key == curses.KEY_DOWN and current_row < len(menu) - 1:
-            current_row += 1
-        elif key in {curses.KEY_ENTER, ord("\n")}:
-            label, action = menu[current_row]
-            if label == "Exit":
+        timeout = None
+        if dirty or dirty_rows or output_dirty or drawn_row != current_row:
+            timeout = max(0.0, last_draw + _FRAME_INTERVAL - time.monotonic())
+        ready, _, _ = select.select([sys.stdin, waker.r], [], [], timeout)
+        if waker.r in ready:
+            if b"R" in os.read(waker.r, 64):
+                resize_pending = dirty = True
+            # Finished jobs update their markers and the output window.
+            while finished:
+                fut = finished.popleft()
+                dirty_rows.update(row for row, job in pending.items() if job is fut)
+                output, output_dirty = _output(fut), True
+        if sys.stdin in ready:
+            # Drain the whole burst (e.g. a held arrow key) before drawing.
+            quit_menu = False
+            stdscr.nodelay(True)
+            while not quit_menu and (key := stdscr.getch()) != -1:
+                if key == curses.KEY_UP:
+                    current_row = max(current_row - 1, 0)
+                elif key == curses.KEY_DOWN:
+                    current_row = min(current_row + 1, exit_idx)
+                elif key == ord(" ") and menu[current_row][2] is not None:
+                    selected ^= {current_row}
+                    dirty_rows.add(current_row)
+                elif key in enter_keys:
+                    if selected:
+                        # Rows still starting are left out, as for single
+                        # rows, so no service gets a second concurrent up.
+                        rows = sorted(row for row in selected if not busy(row))
+                        dirty_rows.update(selected)
+                        selected.clear()
+                        if not rows:
+                            continue
+                        names = [menu[row][2] for row in rows]
+                        if exec_mode:
+                            _exec_start(names)
+                        start = partial(registry.ensure_many, names, runner=_RUNNER)
+                        fut = _submit(start, pool, waker, finished)
+                    elif current_row == exit_idx:
+                        quit_menu = True
+                        continue
+                    elif busy(current_row):
+                        continue
+                    else:
+                        action = menu[current_row][1]
+                        if isinstance(action, list):
+                            _exec_start(action)
+                        rows = [current_row]
+                        fut = _submit(action, pool, waker, finished)
+                    pending.update(dict.fromkeys(rows, fut))
+                    dirty_rows.update(rows)
+                elif key == 27:  # ESC key
+                    quit_menu = True
+            stdscr.nodelay(False)
+            if quit_menu:
                 break
-            stdscr.clear()
-            stdscr.addstr(0, 0, f"Running: {label}\n")
-            stdscr.refresh()
-            action()
-            stdscr.addstr(2, 0, "Press any key to return to menu")
-            stdscr.getch()
-        elif key == 27:  # ESC key
-            break
+        now = time.monotonic()
+        if now - last_draw < _FRAME_INTERVAL:
+            continue
+        if dirty:
+            if resize_pending:
+                _resize(stdscr)
+            draw_menu(
+                stdscr,
+                current_row,
+                _ROW_BYTES,
+                _LABEL_LENS,
+                selected,
+                pending,
+                output,
+            )
+        elif dirty_rows or output_dirty or drawn_row != current_row:
+            xs, ys = _layout(*stdscr.getmaxyx(), _LABEL_LENS)
+            for row in dirty_rows | {drawn_row, current_row}:
+                text = _ROW_BYTES[row][row in selected]
+                status = _status(pending.get(row))
+                redraw_row(stdscr, text, xs[row], ys[row], row == current_row, status)
+            if output_dirty:
+                _draw_output(stdscr, output)
+            curses.doupdate()
+        else:
+            continue
+        dirty = output_dirty = resize_pending = False
+        drawn_row = current_row
+        dirty_rows.clear()
+        last_draw = now
+    return list(dict.fromkeys(pending.values()))
 
 
 def main() -> None:
-    curses.wrapper(run_menu)
+    # curses is imported lazily so that tests and --write-compose can import
+    # this module without loading ncurses.
+    import curses
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--write-compose",
+        action="store_true",
+        help=f"regenerate {COMPOSE_FILE.name} from the container table and exit",
+    )
+    parser.add_argument(
+        "--exec",
+        action="store_true",
+        help="replace the menu with the selected docker command (one-shot mode)",
+    )
+    args = parser.parse_args()
+    if args.write_compose:
+        COMPOSE_FILE.write_text(compose_yaml())
+        return
+    running = curses.wrapper(run_menu, args.exec)
+    if running:
+        print(
+            f"Waiting for {len(running)} running job(s) to finish...", file=sys.stderr
+        )
+        wait(running)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,229 @@
+import inspect
+import os
+import pathlib
+import shutil
+import subprocess
+
+import pytest
+
+from scripts import service_menu
+
+
+def test_compose_file_matches_container_table() -> None:
+    """The shipped Compose file must be regenerated when CONTAINERS changes."""
+    compose = pathlib.Path("scripts/docker-compose.services.yml").read_text()
+    assert compose == service_menu.compose_yaml()
+
+
+def test_service_names_align_with_menu() -> None:
+    assert len(service_menu.SERVICE_NAMES) == len(service_menu._MENU)
+    for name, (label, *_) in zip(service_menu.SERVICE_NAMES, service_menu._MENU):
+        assert (name is not None) == label.endswith(" container")
+    for exec_mode in (False, True):
+        menu = service_menu._build_menu(exec_mode=exec_mode)
+        assert tuple(name for *_, name in menu) == service_menu.SERVICE_NAMES
+
+
+async def test_starter_dry_run_returns_docker_command() -> None:
+    starter = service_menu._starter("pg", runner=service_menu._echo_runner)
+    rc, output = await starter()
+    assert rc == 0
+    assert output.endswith("up -d pg")
+
+
+async def test_compose_up_batches_services() -> None:
+    rc, output = await service_menu.compose_up(
+        ["neo4j", "qdrant"], runner=service_menu._echo_runner
+    )
+    assert rc == 0
+    assert output.endswith("up -d neo4j qdrant")
+
+
+async def test_run_command_returns_failure_without_raising(capsys) -> None:
+    async def failing(command, **_):
+        return 3, "boom"
+
+    rc, output = await service_menu.run_command(["docker", "ps"], runner=failing)
+    assert rc == 3
+    assert output == "Command failed (rc=3): docker ps\nboom"
+    assert capsys.readouterr().out == ""
+
+
+async def test_run_command_captures_stdout_and_stderr() -> None:
+    command = ["sh", "-c", "echo out; echo err >&2"]
+    assert await service_menu.run_command(command) == (0, "out\nerr")
+    assert await service_menu.run_command(command, capture=False) == (0, "")
+
+
+async def test_run_command_passes_env_and_cwd(tmp_path) -> None:
+    command = ["sh", "-c", 'test "$GREETING" = hi && test "$(pwd)" = "$EXPECTED"']
+    env = {"PATH": "/usr/bin:/bin", "GREETING": "hi", "EXPECTED": str(tmp_path)}
+    rc, _ = await service_menu.run_command(command, env=env, cwd=str(tmp_path))
+    assert rc == 0
+
+
+async def test_default_runner_reports_missing_binary() -> None:
+    rc, output = await service_menu._default_runner(["no-such-binary-xyz"])
+    assert rc == 127
+    assert "not found" in output
+
+
+async def test_start_all_combines_results_and_exceptions() -> None:
+    async def ok():
+        return 0, "started"
+
+    async def failing():
+        return 2, "failed"
+
+    async def raising():
+        raise RuntimeError("boom")
+
+    rc, output = await service_menu.start_all([ok, failing, raising])
+    assert rc == 2
+    assert output == "started\nfailed\nRuntimeError('boom')"
+
+
+def _fake_docker(inspect_output: dict, calls: list):
+    """Runner that answers ``docker inspect`` from ``inspect_output``."""
+
+    async def runner(command, **_):
+        calls.append(command)
+        if command[1] == "inspect":
+            state = inspect_output.get(command[-1])
+            return (0, state) if state else (1, f"No such object: {command[-1]}")
+        return 0, f"{command[1]} ok"
+
+    return runner
+
+
+async def test_ensure_leaves_running_container_alone() -> None:
+    calls = []
+    runner = _fake_docker({"neo4j": "true"}, calls)
+    result = await service_menu.ServiceRegistry().ensure("neo4j", runner=runner)
+    assert result == (0, "neo4j is already running")
+    assert len(calls) == 1
+
+
+async def test_ensure_starts_stopped_container() -> None:
+    calls = []
+    runner = _fake_docker({"neo4j": "false"}, calls)
+    result = await service_menu.ServiceRegistry().ensure("neo4j", runner=runner)
+    assert result == (0, "start ok")
+    assert calls[-1] == ["docker", "start", "neo4j"]
+
+
+async def test_ensure_runs_missing_container() -> None:
+    calls = []
+    runner = _fake_docker({}, calls)
+    result = await service_menu.ServiceRegistry().ensure("neo4j", runner=runner)
+    assert result == (0, "compose ok")
+    assert calls[-1][:2] == ["docker", "compose"]
+    assert calls[-1][-1] == "neo4j"
+
+
+async def test_ensure_many_only_composes_missing_containers() -> None:
+    calls = []
+    runner = _fake_docker({"neo4j": "true", "qdrant": "false"}, calls)
+    rc, output = await service_menu.ServiceRegistry().ensure_many(
+        ["neo4j", "qdrant", "sentry", "archon"], runner=runner
+    )
+    assert rc == 0
+    assert output == "neo4j is already running\nstart ok\ncompose ok"
+    assert ["docker", "start", "qdrant"] in calls
+    (compose,) = [command for command in calls if command[1] == "compose"]
+    assert compose[-3:] == ["-d", "sentry", "archon"]
+
+
+async def test_echo_runner_never_prints(capsys) -> None:
+    result = await service_menu._echo_runner(["docker", "ps"], capture=False)
+    assert result == (0, "docker ps")
+    assert capsys.readouterr().out == ""
+
+
+async def test_default_runner_resolves_against_child_path_and_cwd(tmp_path) -> None:
+    script = tmp_path / "hello"
+    script.write_text("#!/bin/sh\necho hi\n")
+    script.chmod(0o755)
+    env = {"PATH": f"{tmp_path}:/usr/bin:/bin"}
+    assert await service_menu._default_runner(["hello"], env=env) == (0, "hi")
+    result = await service_menu._default_runner(["./hello"], cwd=str(tmp_path))
+    assert result == (0, "hi")
+
+
+@pytest.mark.skipif(
+    not getattr(subprocess, "_USE_POSIX_SPAWN", False),
+    reason="subprocess only uses posix_spawn on glibc and macOS",
+)
+async def test_default_runner_spawns_via_posix_spawn(monkeypatch) -> None:
+    calls = []
+    posix_spawn = os.posix_spawn
+
+    def recording_spawn(path, *args, **kwargs):
+        calls.append(path)
+        return posix_spawn(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "posix_spawn", recording_spawn)
+    assert await service_menu._default_runner(["echo", "hi"]) == (0, "hi")
+    assert calls == [shutil.which("echo")]
+
+
+async def test_run_command_tolerates_undecodable_output() -> None:
+    command = ["sh", "-c", r"printf 'ok\377'"]
+    assert await service_menu.run_command(command) == (0, "ok�")
+
+
+def test_layout_depends_on_labels_as_well_as_size() -> None:
+    xs, ys = service_menu._layout(24, 80, (10, 20))
+    assert (xs, ys) == ([35, 30], [9, 10])
+    xs, ys = service_menu._layout(24, 80, (4,))
+    assert (xs, ys) == ([38], [10])
+
+
+def test_layout_keeps_clear_of_output_window() -> None:
+    h = 20
+    _, ys = service_menu._layout(h, 80, service_menu._LABEL_LENS)
+    assert max(ys) < h - service_menu._OUTPUT_HEIGHT
+
+
+async def test_start_all_row_runs_one_compose_up() -> None:
+    calls = []
+    menu = service_menu._build_menu(runner=_fake_docker({"neo4j": "true"}, calls))
+    ((_, start_all, _),) = [row for row in menu if row[0] == "Start all containers"]
+    rc, _ = await start_all()
+    assert rc == 0
+    (compose,) = [command for command in calls if command[1] == "compose"]
+    assert "neo4j" not in compose
+    assert compose[-1] == "agent_zero"
+
+
+def test_compose_yaml_quotes_environment_values() -> None:
+    yaml = pytest.importorskip("yaml")
+    value = "A=*x: y #z"
+    compose = service_menu.compose_yaml([("X", "x", "img", ("-e", value))])
+    assert yaml.safe_load(compose)["services"]["x"]["environment"] == [value]
+
+
+def test_runner_defaults_follow_dry_run_switch() -> None:
+    for fn in (
+        service_menu.run_command,
+        service_menu.compose_up,
+        service_menu.ServiceRegistry.ensure,
+        service_menu.ServiceRegistry.ensure_many,
+        service_menu._starter,
+        service_menu._build_menu,
+    ):
+        default = inspect.signature(fn).parameters["runner"].default
+        assert default is service_menu._RUNNER, fn.__qualname__
+
+
+def test_exec_start_reuses_existing_containers(monkeypatch) -> None:
+    execs = []
+    monkeypatch.setattr(service_menu, "_exec", execs.append)
+    runner = _fake_docker({"neo4j": "true", "qdrant": "false"}, [])
+    service_menu._exec_start(["neo4j", "qdrant"], runner)
+    service_menu._exec_start(["sentry"], runner)
+    service_menu._exec_start(["neo4j", "sentry"], runner)
+    assert execs[0] == ["docker", "start", "neo4j", "qdrant"]
+    assert execs[1][:2] == ["docker", "compose"] and execs[1][-1] == "sentry"
+    assert execs[2][:2] == ["sh", "-c"]
+    assert execs[2][2].startswith("docker start neo4j && exec docker compose")